@@ -1,26 +1,136 @@
-import json
+import asyncio
 import os
 import re
 import time
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
 from urllib.parse import urljoin, urlparse
 import requests
 from bs4 import BeautifulSoup
-import praw
-from dataclasses import dataclass, asdict
+import asyncpraw
+import ahocorasick
+import numpy as np
+import orjson
+from dataclasses import dataclass
 import ollama
+from huggingface_hub import constants as hf_constants, hf_hub_download
+from huggingface_hub.errors import LocalEntryNotFoundError
+from tokenizers import Tokenizer
 
 # Configuration Constants
 DEFAULT_USER_AGENT = "RedditPersonaGenerator/2.0 (by /u/PersonaBot)"
 DEFAULT_POST_LIMIT = 100
+MAX_CONTENT_CHARS = 2000
+PARENT_FETCH_CONCURRENCY = 10
 SCRAPED_DATA_DIR = "scraped_data"
 PERSONA_OUTPUT_DIR = "persona_output"
 LOG_DIR = "logs"
-MISTRAL_MODEL = "mistral"
+MISTRAL_MODEL = os.environ.get("REDDIT_PERSONA_MODEL", "mistral:7b-instruct-q4_K_M")
+MODEL_KEEP_ALIVE = "1h"
+MISTRAL_NUM_CTX = 8192
+MISTRAL_MAX_NUM_CTX = 32768
+# Hugging Face repo id (an ungated copy of the Mistral tokenizer), or a path to a local tokenizer.json
+MISTRAL_TOKENIZER = os.environ.get("REDDIT_PERSONA_TOKENIZER", "unsloth/mistral-7b-instruct-v0.2")
+HF_HUB_TIMEOUT = 3
+RESPONSE_TOKEN_RESERVE = 512
+PERSONA_BATCH_SIZE = 4
+SEARCH_SEPARATOR = "\x00"
+UNKNOWN_VALUES = {"unknown", "n/a", ""}
+USERNAME_URL_PATTERN = re.compile(r'reddit\.com/u(?:ser)?/([^/?#]+)')
+# Conservative fallback estimate: Mistral splits digits into one token each
+CHARS_PER_TOKEN = 3
+DIGIT_PATTERN = re.compile(r'\d')
+# [INST]/[/INST] markers and BOS added by the chat template
+CHAT_TEMPLATE_TOKENS = 16
 
-@dataclass
+PERSONA_SCHEMA = """{
+    "name": "Persona name (e.g., 'Tech-Savvy Gamer' or 'Aspiring Developer')",
+    "age_range": "Estimated age range (e.g., '25-35')",
+    "location": "Estimated location/region if mentioned",
+    "occupation": "Estimated profession/occupation",
+    "interests": ["List of interests and hobbies"],
+    "personality_traits": ["List of personality characteristics"],
+    "communication_style": "Description of how they communicate",
+    "goals_motivations": ["List of goals and motivations"],
+    "pain_points": ["List of challenges and frustrations"],
+    "technical_proficiency": "Level of technical skills",
+    "social_behavior": "How they interact socially online",
+    "content_preferences": ["Types of content they engage with"],
+    "activity_patterns": "When and how often they post"
+}"""
+
+ANALYSIS_GUIDELINES = """Please analyze the content carefully and provide insights based on:
+1. Language patterns and vocabulary used
+2. Topics and subreddits they engage with
+3. Timing and frequency of posts
+4. Interaction style with other users
+5. Interests and expertise areas
+6. Geographic or cultural references
+7. Professional or academic mentions
+8. Personal challenges or goals mentioned"""
+
+USER_PROMPT_TEMPLATE = """
+Username: {username}
+
+Reddit Data:
+{posts_text}
+"""
+
+BATCH_PROMPT_TEMPLATE = """
+There are {count} users, labelled {labels}.
+
+Reddit Data:
+{users_section}
+"""
+
+BATCH_USER_TEMPLATE = """
+=== USER {user_id} (Username: {username}) ===
+{posts_text}
+=== END USER {user_id} ===
+"""
+
+POST_ANALYSIS_TEMPLATE = """
+Post {index}:
+Type: {post_type}
+Subreddit: r/{subreddit}
+Title: {title}
+Content: {content}
+Score: {score}
+Date: {date}
+URL: {url}
+{parent_context}
+---
+"""
+
+# Fixed instruction prefix shared by every request, so Ollama can reuse its KV-cache
+SYSTEM_PROMPT = f"""
+Analyze the Reddit user's posts and comments provided by the user to create a detailed user persona.
+
+Based on the content provided, give a JSON response with the following structure:
+{PERSONA_SCHEMA}
+
+{ANALYSIS_GUIDELINES}
+
+IMPORTANT: Respond with ONLY valid JSON. No additional text, explanations, or markdown formatting.
+"""
+
+BATCH_SYSTEM_PROMPT = f"""
+Analyze the Reddit users' posts and comments provided by the user to create a detailed user persona for each user.
+Each user is labelled with an id (U1, U2, ...).
+
+Provide a JSON object with a single "personas" key holding an array with exactly one object
+per user, in the same order as the users appear.
+Each object must have a "user_id" field (e.g. "U1") plus the following structure:
+{PERSONA_SCHEMA}
+
+{ANALYSIS_GUIDELINES}
+
+IMPORTANT: Respond with ONLY valid JSON. No additional text, explanations, or markdown formatting.
+"""
+
+@dataclass(slots=True)
 class RedditPost:
     """Data class for Reddit posts and comments"""
     title: str
@@ -31,8 +141,9 @@ class RedditPost:
     url: str
     post_type: str  # 'post' or 'comment'
     parent_context: Optional[str] = None
+    content_len: int = 0  # Length of the full text before truncation
 
-@dataclass
+@dataclass(slots=True)
 class UserPersona:
     """Data class for user persona"""
     name: str
@@ -50,7 +161,14 @@ class UserPersona:
     activity_patterns: str
     citations: Dict[str, List[str]]
 
-@dataclass
+@dataclass(slots=True)
+class SearchCorpus:
+    """Data class for posts' searchable text, laid out as parallel arrays"""
+    urls: List[str]
+    text: str
+    starts: List[int]
+
+@dataclass(slots=True)
 class ExecutionLog:
     """Data class for execution logging"""
     username: str
@@ -77,7 +195,7 @@ class DirectoryManager:
     @staticmethod
     def get_scraped_data_path(username: str) -> str:
         """Get path for scraped data file"""
-        return os.path.join(SCRAPED_DATA_DIR, f"{username}_scraped_data.json")
+        return os.path.join(SCRAPED_DATA_DIR, f"{username}_scraped_data.ndjson")
     
     @staticmethod
     def get_persona_output_path(username: str) -> str:
@@ -87,6 +205,11 @@ class DirectoryManager:
     @staticmethod
     def get_log_path() -> str:
         """Get path for log file"""
+        return os.path.join(LOG_DIR, "execution_log.jsonl")
+    
+    @staticmethod
+    def get_legacy_log_path() -> str:
+        """Get path for the JSON array log file used by earlier versions"""
         return os.path.join(LOG_DIR, "execution_log.json")
 
 class Logger:
@@ -95,6 +218,7 @@ class Logger:
     def __init__(self):
         self.log_file = DirectoryManager.get_log_path()
         self.setup_logging()
+        self.import_legacy_logs()
     
     def setup_logging(self):
         """Setup logging configuration"""
@@ -108,17 +232,35 @@ class Logger:
         )
         self.logger = logging.getLogger(__name__)
     
-    def log_execution(self, log_entry: ExecutionLog):
-        """Log execution details"""
-        # Load existing logs
-        logs = self.load_logs()
+    def import_legacy_logs(self):
+        """Carry over history from the old JSON array log on first run"""
+        legacy_file = DirectoryManager.get_legacy_log_path()
+        if os.path.exists(self.log_file) or not os.path.exists(legacy_file):
+            return
+        
+        try:
+            with open(legacy_file, 'rb') as f:
+                logs = orjson.loads(f.read())
+        except (OSError, orjson.JSONDecodeError) as e:
+            self.logger.warning(f"Could not import legacy execution log {legacy_file}: {e}")
+            return
+        if not isinstance(logs, list):
+            logs = []
         
-        # Add new log entry
-        logs.append(asdict(log_entry))
+        # Write to a temporary file first so an interrupted import is retried next run
+        tmp_file = f"{self.log_file}.tmp"
+        with open(tmp_file, 'wb') as f:
+            for log in logs:
+                f.write(orjson.dumps(log) + b"\n")
+        os.replace(tmp_file, self.log_file)
         
-        # Save updated logs
-        with open(self.log_file, 'w', encoding='utf-8') as f:
-            json.dump(logs, f, indent=2, ensure_ascii=False)
+        self.logger.info(f"Imported {len(logs)} entries from legacy execution log {legacy_file}")
+    
+    def log_execution(self, log_entry: ExecutionLog):
+        """Log execution details"""
+        # Append new log entry as a single JSON line
+        with open(self.log_file, 'ab') as f:
+            f.write(orjson.dumps(log_entry) + b"\n")
         
         # Log to console
         if log_entry.error_message:
@@ -126,47 +268,52 @@ class Logger:
         else:
             self.logger.info(f"Successfully processed {log_entry.username} in {log_entry.duration:.2f}s")
     
+    def iter_logs(self) -> Iterator[Dict]:
+        """Stream existing execution logs one entry at a time"""
+        if not os.path.exists(self.log_file):
+            return
+        
+        with open(self.log_file, 'rb') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    yield orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    continue
+    
     def load_logs(self) -> List[Dict]:
         """Load existing execution logs"""
-        if os.path.exists(self.log_file):
-            try:
-                with open(self.log_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, FileNotFoundError):
-                return []
-        return []
+        return list(self.iter_logs())
     
     def get_execution_stats(self) -> Dict:
         """Get execution statistics"""
-        logs = self.load_logs()
-        if not logs:
-            return {
-                "total_executions": 0,
-                "successful": 0,
-                "failed": 0,
-                "success_rate": 0.0,
-                "last_execution": "Never"
-            }
-        
-        successful = len([log for log in logs if log.get('persona_generated', False)])
-        failed = len(logs) - successful
+        total = 0
+        successful = 0
+        last_execution = "Never"
+        
+        for log in self.iter_logs():
+            total += 1
+            if log.get('persona_generated', False):
+                successful += 1
+            last_execution = log.get('execution_time', last_execution)
         
         return {
-            "total_executions": len(logs),
+            "total_executions": total,
             "successful": successful,
-            "failed": failed,
-            "success_rate": (successful / len(logs)) * 100 if logs else 0.0,
-            "last_execution": logs[-1]['execution_time'] if logs else "Never"
+            "failed": total - successful,
+            "success_rate": (successful / total) * 100 if total else 0.0,
+            "last_execution": last_execution
         }
 
 class RedditScraper:
-    """Handles Reddit data scraping using PRAW"""
+    """Handles Reddit data scraping using Async PRAW"""
     
     def __init__(self, client_id: str, client_secret: str, user_agent: str = DEFAULT_USER_AGENT):
         """Initialize Reddit scraper"""
         self.logger = logging.getLogger(__name__)
         try:
-            self.reddit = praw.Reddit(
+            self.reddit = asyncpraw.Reddit(
                 client_id=client_id,
                 client_secret=client_secret,
                 user_agent=user_agent
@@ -175,74 +322,43 @@ class RedditScraper:
         except Exception as e:
             self.logger.error(f"Failed to initialize Reddit API: {e}")
             raise
+        
+        # Cap the number of parent lookups in flight at once
+        self._parent_semaphore = asyncio.Semaphore(PARENT_FETCH_CONCURRENCY)
+        
+        # Cache parent context by fullname and redditors by name to avoid repeat requests
+        self._parent_cache: Dict[str, str] = {}
+        self._redditor_cache: Dict[str, asyncpraw.models.Redditor] = {}
+    
+    async def close(self):
+        """Close the underlying Reddit HTTP session"""
+        await self.reddit.close()
     
     def extract_username_from_url(self, url: str) -> str:
         """Extract username from Reddit profile URL"""
-        patterns = [
-            r'reddit\.com/user/([^/]+)',
-            r'reddit\.com/u/([^/]+)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, url)
-            if match:
-                username = match.group(1)
-                self.logger.info(f"Extracted username: {username}")
-                return username
+        match = USERNAME_URL_PATTERN.search(url)
+        if match:
+            username = match.group(1)
+            self.logger.info(f"Extracted username: {username}")
+            return username
         
         raise ValueError(f"Could not extract username from URL: {url}")
     
-    def scrape_user_data(self, username: str, limit: int = DEFAULT_POST_LIMIT) -> Tuple[List[RedditPost], Dict]:
-        """Scrape user's posts and comments"""
-        posts = []
+    async def scrape_user_data(self, username: str, limit: int = DEFAULT_POST_LIMIT,
+                               output_file: Optional[BinaryIO] = None) -> Tuple[List[RedditPost], Dict]:
+        """Scrape user's posts and comments, streaming each one to output_file if given"""
         stats = {"posts": 0, "comments": 0, "errors": 0}
         
         try:
-            user = self.reddit.redditor(username)
+            user = await self._get_redditor(username)
             self.logger.info(f"Scraping data for user: {username}")
             
-            # Scrape posts
-            self.logger.info("Scraping user posts...")
-            for submission in user.submissions.new(limit=limit):
-                try:
-                    post = RedditPost(
-                        title=submission.title or "No title",
-                        content=submission.selftext or "",
-                        subreddit=str(submission.subreddit) if submission.subreddit else "Unknown",
-                        score=submission.score or 0,
-                        created_utc=submission.created_utc or 0,
-                        url=f"https://reddit.com{submission.permalink}",
-                        post_type="post"
-                    )
-                    posts.append(post)
-                    stats["posts"] += 1
-                except Exception as e:
-                    stats["errors"] += 1
-                    self.logger.warning(f"Error processing submission: {e}")
-                    continue
-            
-            # Scrape comments
-            self.logger.info("Scraping user comments...")
-            for comment in user.comments.new(limit=limit):
-                try:
-                    parent_context = self._get_parent_context(comment)
-                    
-                    post = RedditPost(
-                        title=f"Comment in r/{comment.subreddit}" if comment.subreddit else "Comment",
-                        content=comment.body or "",
-                        subreddit=str(comment.subreddit) if comment.subreddit else "Unknown",
-                        score=comment.score or 0,
-                        created_utc=comment.created_utc or 0,
-                        url=f"https://reddit.com{comment.permalink}",
-                        post_type="comment",
-                        parent_context=parent_context
-                    )
-                    posts.append(post)
-                    stats["comments"] += 1
-                except Exception as e:
-                    stats["errors"] += 1
-                    self.logger.warning(f"Error processing comment: {e}")
-                    continue
+            # Fetch posts and comments concurrently
+            submissions, comments = await asyncio.gather(
+                self._scrape_submissions(user, limit, stats, output_file),
+                self._scrape_comments(user, limit, stats, output_file)
+            )
+            posts = submissions + comments
             
             self.logger.info(f"Scraped {stats['posts']} posts and {stats['comments']} comments")
             return posts, stats
@@ -251,18 +367,111 @@ class RedditScraper:
             self.logger.error(f"Error scraping user data: {e}")
             raise
     
-    def _get_parent_context(self, comment) -> str:
+    async def _get_redditor(self, username: str) -> asyncpraw.models.Redditor:
+        """Get a (cached) redditor instance"""
+        if username not in self._redditor_cache:
+            self._redditor_cache[username] = await self.reddit.redditor(username)
+        return self._redditor_cache[username]
+    
+    async def _scrape_submissions(self, user, limit: int, stats: Dict,
+                                  output_file: Optional[BinaryIO]) -> List[RedditPost]:
+        """Scrape user's submissions"""
+        posts = []
+        
+        self.logger.info("Scraping user posts...")
+        async for submission in user.submissions.new(limit=limit):
+            try:
+                # Only keep as much text as analysis can use
+                content = submission.selftext or ""
+                post = RedditPost(
+                    title=submission.title or "No title",
+                    content=content[:MAX_CONTENT_CHARS],
+                    subreddit=str(submission.subreddit) if submission.subreddit else "Unknown",
+                    score=submission.score or 0,
+                    created_utc=submission.created_utc or 0,
+                    url=f"https://reddit.com{submission.permalink}",
+                    post_type="post",
+                    content_len=len(content)
+                )
+                posts.append(post)
+                self._write_post(post, output_file)
+                stats["posts"] += 1
+            except Exception as e:
+                stats["errors"] += 1
+                self.logger.warning(f"Error processing submission: {e}")
+                continue
+        
+        return posts
+    
+    async def _scrape_comments(self, user, limit: int, stats: Dict,
+                               output_file: Optional[BinaryIO]) -> List[RedditPost]:
+        """Scrape user's comments along with their parent context"""
+        posts = []
+        
+        self.logger.info("Scraping user comments...")
+        comments = [comment async for comment in user.comments.new(limit=limit)]
+        
+        # Issue all parent lookups together, once per distinct parent
+        unique_parents = {}
+        for comment in comments:
+            unique_parents.setdefault(comment.parent_id, comment)
+        parent_contexts = dict(zip(
+            unique_parents,
+            await asyncio.gather(*(self._get_parent_context(c) for c in unique_parents.values()))
+        ))
+        
+        for comment in comments:
+            try:
+                parent_context = parent_contexts[comment.parent_id]
+                
+                # Only keep as much text as analysis can use
+                content = comment.body or ""
+                post = RedditPost(
+                    title=f"Comment in r/{comment.subreddit}" if comment.subreddit else "Comment",
+                    content=content[:MAX_CONTENT_CHARS],
+                    subreddit=str(comment.subreddit) if comment.subreddit else "Unknown",
+                    score=comment.score or 0,
+                    created_utc=comment.created_utc or 0,
+                    url=f"https://reddit.com{comment.permalink}",
+                    post_type="comment",
+                    parent_context=parent_context,
+                    content_len=len(content)
+                )
+                posts.append(post)
+                self._write_post(post, output_file)
+                stats["comments"] += 1
+            except Exception as e:
+                stats["errors"] += 1
+                self.logger.warning(f"Error processing comment: {e}")
+                continue
+        
+        return posts
+    
+    @staticmethod
+    def _write_post(post: RedditPost, output_file: Optional[BinaryIO]):
+        """Append a post to the scraped data file as one JSON line"""
+        if output_file is not None:
+            output_file.write(orjson.dumps(post) + b"\n")
+    
+    async def _get_parent_context(self, comment) -> str:
         """Get parent context for a comment"""
+        parent_id = comment.parent_id
+        if parent_id in self._parent_cache:
+            return self._parent_cache[parent_id]
+        
         try:
-            if hasattr(comment, 'parent') and comment.parent():
-                parent = comment.parent()
-                if hasattr(parent, 'body'):
-                    context = parent.body[:200] + "..." if len(parent.body) > 200 else parent.body
-                    return context
-                elif hasattr(parent, 'title'):
-                    return parent.title
-        except:
-            pass
+            async with self._parent_semaphore:
+                parent = await comment.parent()
+                await parent.load()
+            context = ""
+            if hasattr(parent, 'body'):
+                context = parent.body[:200] + "..." if len(parent.body) > 200 else parent.body
+            elif hasattr(parent, 'title'):
+                context = parent.title
+            self._parent_cache[parent_id] = context
+            return context
+        except Exception as e:
+            self.logger.warning(f"Error fetching parent context for {parent_id}: {e}")
         return ""
 
 class PersonaGenerator:
@@ -279,21 +488,108 @@ class PersonaGenerator:
         except Exception as e:
             self.logger.error(f"Failed to initialize Ollama client: {e}")
             raise
+        
+        # Fall back to a character-based estimate if the tokenizer can't be loaded
+        try:
+            self.tokenizer = self._load_tokenizer()
+        except Exception as e:
+            self.tokenizer = None
+            self.logger.warning(
+                f"Could not load tokenizer '{MISTRAL_TOKENIZER}', estimating token counts instead: {e}. "
+                "Set REDDIT_PERSONA_TOKENIZER to a local tokenizer.json for offline use"
+            )
+        
+        # The system prompts are constant, so count their tokens once
+        self.prompt_tokens = {
+            SYSTEM_PROMPT: self._count_tokens(SYSTEM_PROMPT),
+            BATCH_SYSTEM_PROMPT: self._count_tokens(BATCH_SYSTEM_PROMPT)
+        }
+    
+    @staticmethod
+    def _load_tokenizer() -> Tokenizer:
+        """Load the tokenizer from a local file, the Hugging Face cache or the Hub"""
+        if os.path.isfile(MISTRAL_TOKENIZER):
+            return Tokenizer.from_file(MISTRAL_TOKENIZER)
+        
+        try:
+            path = hf_hub_download(MISTRAL_TOKENIZER, "tokenizer.json", local_files_only=True)
+        except LocalEntryNotFoundError:
+            # The download retries for ~20s when offline, so check the Hub is reachable first
+            requests.head(hf_constants.ENDPOINT, timeout=HF_HUB_TIMEOUT)
+            path = hf_hub_download(MISTRAL_TOKENIZER, "tokenizer.json")
+        return Tokenizer.from_file(path)
+    
+    def preload_model(self):
+        """Load the model into Ollama and keep it resident to avoid a cold start"""
+        try:
+            self.logger.info(f"Preloading model: {self.model_name}")
+            self.client.generate(model=self.model_name, prompt="", keep_alive=MODEL_KEEP_ALIVE)
+        except Exception as e:
+            self.logger.warning(f"Failed to preload model {self.model_name}: {e}")
     
     def generate_persona(self, posts: List[RedditPost], username: str) -> UserPersona:
         """Generate user persona from scraped posts"""
         self.logger.info(f"Generating persona for {username} using {len(posts)} posts")
         
-        # Prepare data for analysis
-        posts_text = self._prepare_posts_for_analysis(posts)
+        # Prepare data for analysis, leaving room for the prompt around the posts
+        wrapper_tokens = self._count_tokens(self._build_prompt(username, ""))
+        token_budget = (
+            MISTRAL_NUM_CTX - self.prompt_tokens[SYSTEM_PROMPT] - CHAT_TEMPLATE_TOKENS
+            - wrapper_tokens - RESPONSE_TOKEN_RESERVE
+        )
+        posts_text = self._prepare_posts_for_analysis(posts, token_budget)
         
         # Generate persona using Mistral
         persona_data = self._analyze_with_mistral(posts_text, username)
         
+        persona = self._build_persona(posts, username, persona_data)
+        
+        self.logger.info(f"Persona generated successfully for {username}")
+        return persona
+    
+    def generate_personas_batch(self, users: Dict[str, List[RedditPost]]) -> Dict[str, UserPersona]:
+        """Generate personas for several users with a single Mistral request"""
+        if len(users) == 1:
+            username, posts = next(iter(users.items()))
+            return {username: self.generate_persona(posts, username)}
+        
+        self.logger.info(f"Generating personas for {len(users)} users in one batch")
+        
+        # Grow the context window with the batch so each user keeps about the single-user budget
+        num_ctx = min(MISTRAL_NUM_CTX * len(users), MISTRAL_MAX_NUM_CTX)
+        _, wrapper = self._build_batch_prompt({username: "" for username in users})
+        token_budget = (
+            num_ctx - self.prompt_tokens[BATCH_SYSTEM_PROMPT] - CHAT_TEMPLATE_TOKENS
+            - self._count_tokens(wrapper) - RESPONSE_TOKEN_RESERVE * len(users)
+        ) // len(users)
+        users_text = {
+            username: self._prepare_posts_for_analysis(posts, token_budget)
+            for username, posts in users.items()
+        }
+        
+        # Generate all personas using Mistral
+        batch_data = self._analyze_batch_with_mistral(users_text, num_ctx)
+        
+        personas = {}
+        for username, posts in users.items():
+            persona_data = batch_data.get(username)
+            if not persona_data:
+                # Users missing from the batch reply get their own request
+                self.logger.warning(f"No persona returned for {username} in batch, retrying individually")
+                personas[username] = self.generate_persona(posts, username)
+                continue
+            
+            personas[username] = self._build_persona(posts, username, persona_data)
+            self.logger.info(f"Persona generated successfully for {username}")
+        
+        return personas
+    
+    def _build_persona(self, posts: List[RedditPost], username: str, persona_data: Dict) -> UserPersona:
+        """Build a UserPersona from analyzed persona data"""
         # Extract citations
-        citations = self._extract_citations(posts, persona_data)
+        citations = self._extract_citations(self._build_search_corpus(posts), persona_data)
         
-        persona = UserPersona(
+        return UserPersona(
             name=persona_data.get("name", f"Reddit User: {username}"),
             age_range=persona_data.get("age_range", "Unknown"),
             location=persona_data.get("location", "Unknown"),
@@ -309,123 +605,252 @@ class PersonaGenerator:
             activity_patterns=persona_data.get("activity_patterns", "Unknown"),
             citations=citations
         )
-        
-        self.logger.info(f"Persona generated successfully for {username}")
-        return persona
     
-    def _prepare_posts_for_analysis(self, posts: List[RedditPost]) -> str:
-        """Prepare posts data for AI analysis"""
-        analysis_text = []
+    def _prepare_posts_for_analysis(self, posts: List[RedditPost], token_budget: int) -> str:
+        """Prepare posts data for AI analysis within a token budget"""
+        # Summarize posting times up front instead of leaving them to the model
+        activity_summary = self._compute_activity_features(posts)
+        token_budget -= self._count_tokens(activity_summary)
+        
+        # Highest scoring posts first, as they carry the most signal
+        ranked_posts = sorted(posts, key=lambda post: post.score or 0, reverse=True)
+        post_fields = [None] * len(ranked_posts)
         
-        for i, post in enumerate(posts[:50]):  # Limit to first 50 posts for analysis
-            title = str(post.title) if post.title else "No title"
+        # Many posts share a day, so format each date only once
+        dates: Dict[int, str] = {}
+        
+        for i, post in enumerate(ranked_posts):
             content = str(post.content) if post.content else "No content"
-            subreddit = str(post.subreddit) if post.subreddit else "Unknown"
             
-            content_preview = content[:500] + "..." if len(content) > 500 else content
+            day = int(post.created_utc // 86400)
+            if day not in dates:
+                dates[day] = datetime.fromtimestamp(day * 86400, tz=timezone.utc).strftime('%Y-%m-%d')
             
-            post_info = f"""
-Post {i+1}:
-Type: {post.post_type}
-Subreddit: r/{subreddit}
-Title: {title}
-Content: {content_preview}
-Score: {post.score}
-Date: {datetime.fromtimestamp(post.created_utc).strftime('%Y-%m-%d')}
-URL: {post.url}
-{"Parent Context: " + str(post.parent_context)[:200] + "..." if post.parent_context else ""}
----
-"""
-            analysis_text.append(post_info)
+            post_fields[i] = dict(
+                post_type=post.post_type,
+                subreddit=post.subreddit or "Unknown",
+                title=post.title or "No title",
+                content=content if len(content) <= 500 else f"{content[:500]}...",
+                score=post.score,
+                date=dates[day],
+                url=post.url,
+                parent_context=f"Parent Context: {str(post.parent_context)[:200]}..." if post.parent_context else ""
+            )
+        
+        # Count with the rank as the post number, which is never shorter than the final one,
+        # and include the newline each post is joined with
+        analysis_text = [
+            "\n" + POST_ANALYSIS_TEMPLATE.format(index=i + 1, **fields)
+            for i, fields in enumerate(post_fields)
+        ]
+        
+        # Greedily keep posts while they fit in the budget
+        selected = []
+        used_tokens = 0
+        for fields, token_count in zip(post_fields, self._count_tokens_batch(analysis_text)):
+            if used_tokens + token_count > token_budget:
+                continue
+            selected.append(fields)
+            used_tokens += token_count
+        
+        self.logger.info(f"Selected {len(selected)}/{len(posts)} posts ({used_tokens} tokens) for analysis")
+        
+        # Number the selected posts consecutively
+        return "\n".join([activity_summary] + [
+            POST_ANALYSIS_TEMPLATE.format(index=i + 1, **fields)
+            for i, fields in enumerate(selected)
+        ])
+    
+    @staticmethod
+    def _compute_activity_features(posts: List[RedditPost]) -> str:
+        """Summarize when the user posts as compact hour/weekday histograms"""
+        ts = np.fromiter((post.created_utc for post in posts), dtype=np.float64, count=len(posts))
+        ts = ts[ts > 0]
+        if ts.size == 0:
+            return "Activity Summary: no timestamps available"
+        
+        hours = ((ts // 3600) % 24).astype(np.int8)
+        # The Unix epoch fell on a Thursday, so shift by 3 to make Monday day 0
+        weekdays = ((ts // 86400 + 3) % 7).astype(np.int8)
+        
+        hour_counts = np.bincount(hours, minlength=24)
+        weekday_counts = np.bincount(weekdays, minlength=7)
+        
+        # Up to three busiest hours that actually have posts, ties going to the earlier hour
+        busiest = np.argsort(-hour_counts, kind="stable")[:3]
+        peak_hours = sorted(int(hour) for hour in busiest if hour_counts[hour] > 0)
+        weekend_ratio = weekday_counts[5:].sum() / ts.size
+        span_days = max((ts.max() - ts.min()) / 86400, 1.0)
+        
+        return (
+            f"Activity Summary (UTC, {ts.size} posts over {span_days:.0f} days): "
+            f"peak_hours={peak_hours}, "
+            f"hour_histogram={hour_counts.tolist()}, "
+            f"weekday_histogram_mon_to_sun={weekday_counts.tolist()}, "
+            f"weekend_ratio={weekend_ratio:.2f}, "
+            f"posts_per_week={ts.size / span_days * 7:.1f}"
+        )
+    
+    def _count_tokens(self, text: str) -> int:
+        """Count the tokens Mistral will see for text"""
+        return self._count_tokens_batch([text])[0]
+    
+    def _count_tokens_batch(self, texts: List[str]) -> List[int]:
+        """Count tokens for several texts at once"""
+        if self.tokenizer is None:
+            return [self._estimate_tokens(text) for text in texts]
+        return [len(encoding.ids) for encoding in self.tokenizer.encode_batch(texts, add_special_tokens=False)]
+    
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        """Estimate a token count on the high side when no tokenizer is available"""
+        digits = len(DIGIT_PATTERN.findall(text))
+        return (len(text) - digits) // CHARS_PER_TOKEN + digits + 1
+    
+    @staticmethod
+    def _build_prompt(username: str, posts_text: str) -> str:
+        """Build the user message for a single-user request"""
+        return USER_PROMPT_TEMPLATE.format(username=username, posts_text=posts_text)
+    
+    @staticmethod
+    def _build_batch_prompt(users_text: Dict[str, str]) -> Tuple[Dict[str, str], str]:
+        """Build the user message for a batch request, returning the user id mapping with it"""
+        user_ids = {f"U{i+1}": username for i, username in enumerate(users_text)}
         
-        return "\n".join(analysis_text)
+        users_section = "\n".join(
+            BATCH_USER_TEMPLATE.format(user_id=user_id, username=username, posts_text=users_text[username])
+            for user_id, username in user_ids.items()
+        )
+        
+        prompt = BATCH_PROMPT_TEMPLATE.format(
+            count=len(user_ids), labels=", ".join(user_ids), users_section=users_section
+        )
+        return user_ids, prompt
     
     def _analyze_with_mistral(self, posts_text: str, username: str) -> Dict:
         """Analyze posts using Mistral AI"""
-        
-        prompt = f"""
-Analyze the following Reddit user's posts and comments to create a detailed user persona. 
-Username: {username}
-
-Based on the content below, provide a JSON response with the following structure:
-{{
-    "name": "Persona name (e.g., 'Tech-Savvy Gamer' or 'Aspiring Developer')",
-    "age_range": "Estimated age range (e.g., '25-35')",
-    "location": "Estimated location/region if mentioned",
-    "occupation": "Estimated profession/occupation",
-    "interests": ["List of interests and hobbies"],
-    "personality_traits": ["List of personality characteristics"],
-    "communication_style": "Description of how they communicate",
-    "goals_motivations": ["List of goals and motivations"],
-    "pain_points": ["List of challenges and frustrations"],
-    "technical_proficiency": "Level of technical skills",
-    "social_behavior": "How they interact socially online",
-    "content_preferences": ["Types of content they engage with"],
-    "activity_patterns": "When and how often they post"
-}}
-
-Reddit Data:
-{posts_text}
-
-Please analyze the content carefully and provide insights based on:
-1. Language patterns and vocabulary used
-2. Topics and subreddits they engage with
-3. Timing and frequency of posts
-4. Interaction style with other users
-5. Interests and expertise areas
-6. Geographic or cultural references
-7. Professional or academic mentions
-8. Personal challenges or goals mentioned
-
-IMPORTANT: Respond with ONLY valid JSON. No additional text, explanations, or markdown formatting.
-"""
+        prompt = self._build_prompt(username, posts_text)
         
         try:
             self.logger.info("Sending data to Mistral for analysis...")
-            response = self.client.chat(model=self.model_name, messages=[
-                {"role": "user", "content": prompt}
-            ])
-            
-            response_text = response['message']['content'].strip()
-            self.logger.info(f"Raw Mistral response: {response_text[:200]}...")
-            
-            # Clean up response text
-            response_text = response_text.replace('```json', '').replace('```', '').strip()
+            response_text = self._chat(SYSTEM_PROMPT, prompt)
             
-            # Extract JSON from response using multiple methods
-            json_str = None
+            result = self._parse_json_response(response_text)
+            if isinstance(result, dict):
+                return result
+            return self._get_default_persona(username)
+                
+        except Exception as e:
+            self.logger.error(f"Error analyzing with Mistral: {e}")
+            return self._get_default_persona(username)
+    
+    def _analyze_batch_with_mistral(self, users_text: Dict[str, str], num_ctx: int) -> Dict[str, Dict]:
+        """Analyze several users' posts in one Mistral request"""
+        user_ids, prompt = self._build_batch_prompt(users_text)
+        
+        try:
+            self.logger.info(f"Sending data for {len(user_ids)} users to Mistral for analysis...")
+            response_text = self._chat(BATCH_SYSTEM_PROMPT, prompt, num_ctx=num_ctx)
             
-            # Method 1: Try to find JSON block
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(0)
+            result = self._parse_json_response(response_text)
+            if isinstance(result, dict):
+                result = result.get("personas")
+            if not isinstance(result, list):
+                return {}
             
-            # Method 2: If no match, assume entire response is JSON
-            if not json_str:
-                json_str = response_text
+            # Dispatch by user_id first, then hand unlabelled personas to unclaimed users in order
+            batch_data = {}
+            unlabelled = []
+            for persona_data in result:
+                if not isinstance(persona_data, dict):
+                    continue
+                username = user_ids.get(persona_data.pop("user_id", None))
+                if not username:
+                    unlabelled.append(persona_data)
+                elif username not in batch_data:
+                    batch_data[username] = persona_data
             
-            # Method 3: Try to fix common JSON issues
-            if json_str:
-                # Fix common issues with quotes and escaping
-                json_str = re.sub(r'(?<!\\)"(?=\s*[a-zA-Z_][a-zA-Z0-9_]*\s*:)', '"', json_str)
-                json_str = re.sub(r'(?<=:)\s*"([^"]*)"(?=\s*[,}])', r'"\1"', json_str)
+            unclaimed = [username for username in user_ids.values() if username not in batch_data]
+            batch_data.update(zip(unclaimed, unlabelled))
             
-            if json_str:
-                try:
-                    result = json.loads(json_str)
-                    self.logger.info("Successfully parsed Mistral response")
-                    return result
-                except json.JSONDecodeError as je:
-                    self.logger.error(f"JSON decode error: {je}")
-                    self.logger.error(f"Problematic JSON: {json_str[:500]}...")
-                    return self._get_default_persona(username)
-            else:
-                self.logger.warning("Could not extract JSON from Mistral response")
-                return self._get_default_persona(username)
+            return batch_data
                 
         except Exception as e:
-            self.logger.error(f"Error analyzing with Mistral: {e}")
-            return self._get_default_persona(username)
+            self.logger.error(f"Error analyzing batch with Mistral: {e}")
+            return {}
+    
+    def _chat(self, system_prompt: str, user_prompt: str, num_ctx: int = MISTRAL_NUM_CTX) -> str:
+        """Send a system + user message pair to Mistral and return the reply text"""
+        # Keep the shared system prefix when the context shifts, so only the
+        # user-specific suffix has to be prefilled on each request
+        chat_options = {"num_ctx": num_ctx, "num_keep": self.prompt_tokens[system_prompt]}
+        
+        response = self.client.chat(model=self.model_name, messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ], format="json", options=chat_options, keep_alive=MODEL_KEEP_ALIVE)
+        
+        return response['message']['content']
+    
+    def _parse_json_response(self, response_text: str):
+        """Extract and parse JSON from a Mistral response"""
+        response_text = response_text.strip()
+        self.logger.info(f"Raw Mistral response: {response_text[:200]}...")
+        
+        # Fast path: JSON mode normally returns the document as-is
+        try:
+            result = orjson.loads(response_text)
+            self.logger.info("Successfully parsed Mistral response")
+            return result
+        except orjson.JSONDecodeError:
+            pass
+        
+        # Otherwise slice out the first balanced JSON block and retry
+        json_str = self._extract_json_block(response_text)
+        if not json_str:
+            self.logger.warning("Could not extract JSON from Mistral response")
+            return None
+        
+        try:
+            result = orjson.loads(json_str)
+            self.logger.info("Successfully parsed Mistral response")
+            return result
+        except orjson.JSONDecodeError as je:
+            self.logger.error(f"JSON decode error: {je}")
+            self.logger.error(f"Problematic JSON: {json_str[:500]}...")
+            return None
+    
+    @staticmethod
+    def _extract_json_block(text: str) -> Optional[str]:
+        """Return the first balanced {...} or [...] block in text"""
+        starts = [i for i in (text.find('{'), text.find('[')) if i != -1]
+        if not starts:
+            return None
+        
+        start = min(starts)
+        depth = 0
+        in_string = False
+        escaped = False
+        
+        for i in range(start, len(text)):
+            char = text[i]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == '\\':
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char in '{[':
+                depth += 1
+            elif char in '}]':
+                depth -= 1
+                if depth == 0:
+                    return text[start:i + 1]
+        
+        return None
     
     def _get_default_persona(self, username: str) -> Dict:
         """Return default persona structure if AI analysis fails"""
@@ -445,43 +870,85 @@ IMPORTANT: Respond with ONLY valid JSON. No additional text, explanations, or ma
             "activity_patterns": "Unknown"
         }
     
-    def _extract_citations(self, posts: List[RedditPost], persona_data: Dict) -> Dict[str, List[str]]:
+    def _build_search_corpus(self, posts: List[RedditPost]) -> SearchCorpus:
+        """Pack every post's lowercased text into one separated string"""
+        urls = []
+        texts = []
+        starts = []
+        offset = 0
+        
+        for post in posts:
+            text = f"{post.title or ''} {post.content or ''}".lower().replace(SEARCH_SEPARATOR, " ")
+            urls.append(post.url)
+            texts.append(text)
+            starts.append(offset)
+            offset += len(text) + len(SEARCH_SEPARATOR)
+        
+        return SearchCorpus(urls=urls, text=SEARCH_SEPARATOR.join(texts), starts=starts)
+    
+    def _extract_citations(self, corpus: SearchCorpus, persona_data: Dict) -> Dict[str, List[str]]:
         """Extract citations linking persona traits to specific posts"""
         citations = {}
         
+        # Drop placeholder values up front so they never reach the corpus scan
+        field_keywords = {}
+        for field, value in persona_data.items():
+            values = value if isinstance(value, list) else [value]
+            field_keywords[field] = [str(item) for item in values if self._is_known_value(item)]
+        
+        # Collect every keyword so the posts only need to be scanned once
+        relevant_posts = self._find_relevant_posts(
+            corpus, [keyword for keywords in field_keywords.values() for keyword in keywords]
+        )
+        
         for field, value in persona_data.items():
             citations[field] = []
             
             if isinstance(value, list):
-                for item in value:
-                    if item:
-                        relevant_posts = self._find_relevant_posts(posts, item)
-                        citations[field].extend(relevant_posts[:2])
-            elif value and str(value).strip() and str(value) != "Unknown":
-                relevant_posts = self._find_relevant_posts(posts, value)
-                citations[field] = relevant_posts[:3]
+                for keyword in field_keywords[field]:
+                    citations[field].extend(relevant_posts[keyword][:2])
+            elif field_keywords[field]:
+                citations[field] = relevant_posts[field_keywords[field][0]][:3]
             
             # Remove duplicates while preserving order
             citations[field] = list(dict.fromkeys(citations[field]))
         
         return citations
     
-    def _find_relevant_posts(self, posts: List[RedditPost], keyword) -> List[str]:
-        """Find posts relevant to a specific keyword or trait"""
-        relevant = []
+    @staticmethod
+    def _is_known_value(value) -> bool:
+        """Whether a persona value carries information worth citing"""
+        return bool(value) and str(value).strip().lower() not in UNKNOWN_VALUES
+    
+    def _find_relevant_posts(self, corpus: SearchCorpus, keywords: List[str]) -> Dict[str, List[str]]:
+        """Find posts relevant to each keyword or trait"""
+        relevant = {keyword: [] for keyword in keywords}
         
-        if not isinstance(keyword, str):
-            keyword = str(keyword)
+        # A keyword matches on the whole phrase or on any of its words
+        terms = {}
+        for keyword in relevant:
+            keyword_lower = keyword.lower()
+            for term in [keyword_lower] + keyword_lower.split():
+                # A term spanning the separator could match across two posts
+                if SEARCH_SEPARATOR not in term:
+                    terms.setdefault(term, set()).add(keyword)
         
-        keyword_lower = keyword.lower()
+        if not terms:
+            return relevant
         
-        for post in posts:
-            title = str(post.title) if post.title else ""
-            content = str(post.content) if post.content else ""
-            
-            content_to_search = f"{title} {content}".lower()
-            if keyword_lower in content_to_search or any(word in content_to_search for word in keyword_lower.split()):
-                relevant.append(post.url)
+        # Match all terms in a single Aho-Corasick pass over the packed corpus
+        automaton = ahocorasick.Automaton()
+        for term, term_keywords in terms.items():
+            automaton.add_word(term, term_keywords)
+        automaton.make_automaton()
+        
+        matched = [set() for _ in corpus.urls]
+        for end_index, term_keywords in automaton.iter(corpus.text):
+            matched[bisect_right(corpus.starts, end_index) - 1] |= term_keywords
+        
+        for url, post_keywords in zip(corpus.urls, matched):
+            for keyword in post_keywords:
+                relevant[keyword].append(url)
         
         return relevant
 
@@ -580,24 +1047,84 @@ class PersonaGeneratorApp:
             # Get user inputs
             config = self._get_user_configuration()
             
-            # Initialize components
-            scraper = RedditScraper(
-                client_id=config['client_id'],
-                client_secret=config['client_secret']
-            )
-            persona_generator = PersonaGenerator(config['model_name'])
+            asyncio.run(self._run_async(config))
             
-            # Extract username
-            username = scraper.extract_username_from_url(config['reddit_url'])
+        except Exception as e:
+            self.logger.error(f"Application error: {e}")
+            print(f"\n❌ Error: {e}")
+            print("\nPlease check:")
+            print("1. Valid Reddit API credentials")
+            print("2. Ollama running with Mistral model installed")
+            print("3. Internet connection")
+    
+    async def _run_async(self, config: Dict):
+        """Scrape and analyze the configured users inside the event loop"""
+        # Initialize components
+        scraper = RedditScraper(
+            client_id=config['client_id'],
+            client_secret=config['client_secret']
+        )
+        try:
+            # Scraped users are queued and analyzed in batches as scraping continues
+            queue: asyncio.Queue = asyncio.Queue()
+            consumer = None
             
-            # Start execution timing
-            start_time = time.time()
-            execution_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            skipped_urls = []
+            try:
+                for index, reddit_url in enumerate(config['reddit_urls']):
+                    # Nothing will analyze further users once the consumer has failed
+                    if consumer is not None and consumer.done():
+                        skipped_urls = config['reddit_urls'][index:]
+                        break
+                    
+                    job = await self._scrape_user(scraper, reddit_url, config)
+                    if not job:
+                        continue
+                    
+                    # Start loading the model only once there is a user to analyze,
+                    # so it still overlaps with scraping the remaining users
+                    if consumer is None:
+                        consumer = asyncio.create_task(self._analyze_queued_users(queue, config))
+                    await queue.put(job)
+            except Exception:
+                # Keep reporting the scraping error rather than any analysis failure
+                await self._finish_analysis(consumer, queue, skipped_urls, config, reraise=False)
+                raise
             
-            # Create execution log entry
+            await self._finish_analysis(consumer, queue, skipped_urls, config)
+        finally:
+            await scraper.close()
+    
+    async def _finish_analysis(self, consumer: Optional[asyncio.Task], queue: asyncio.Queue,
+                               skipped_urls: List[str], config: Dict, reraise: bool = True):
+        """Signal the end of scraping and wait for the queued users to be analyzed"""
+        if consumer is None:
+            return
+        
+        await queue.put(None)
+        try:
+            await consumer
+        except Exception as e:
+            self._log_dropped_jobs(queue, skipped_urls, config, e)
+            if reraise:
+                raise
+            self.logger.error(f"Persona analysis failed: {e}")
+    
+    def _log_dropped_jobs(self, queue: asyncio.Queue, skipped_urls: List[str], config: Dict, error: Exception):
+        """Log failed executions for users left unanalyzed after the consumer failed"""
+        message = f"Persona analysis aborted: {error}"
+        
+        # Users that were scraped but never picked up
+        while not queue.empty():
+            job = queue.get_nowait()
+            if job is not None:
+                self._log_failed_execution(job['log_entry'], job['start_time'], RuntimeError(message))
+        
+        # Users that were never scraped, keyed by URL like other pre-scrape failures
+        for reddit_url in skipped_urls:
             log_entry = ExecutionLog(
-                username=username,
-                execution_time=execution_time,
+                username=reddit_url,
+                execution_time=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                 duration=0,
                 posts_scraped=0,
                 comments_scraped=0,
@@ -605,82 +1132,152 @@ class PersonaGeneratorApp:
                 persona_generated=False,
                 model_used=config['model_name']
             )
+            self._log_failed_execution(log_entry, time.time(), RuntimeError(message))
+    
+    def _create_persona_generator(self, model_name: str) -> PersonaGenerator:
+        """Create the persona generator and preload its model"""
+        persona_generator = PersonaGenerator(model_name)
+        persona_generator.preload_model()
+        return persona_generator
+    
+    async def _analyze_queued_users(self, queue: asyncio.Queue, config: Dict):
+        """Consume scraped users from the queue, analyzing them in batches"""
+        # Load the tokenizer and warm up the model while more users are scraped
+        persona_generator = await asyncio.to_thread(self._create_persona_generator, config['model_name'])
+        
+        pending = []
+        while True:
+            job = await queue.get()
+            if job is not None:
+                pending.append(job)
             
+            # Flush a full batch, or whatever is left once scraping has finished
+            if pending and (job is None or len(pending) >= PERSONA_BATCH_SIZE):
+                await asyncio.to_thread(self._generate_personas, persona_generator, pending, config)
+                pending = []
+            
+            if job is None:
+                return
+    
+    async def _scrape_user(self, scraper: RedditScraper, reddit_url: str, config: Dict) -> Optional[Dict]:
+        """Scrape and save a single user's data, returning a pending analysis job"""
+        # Start execution timing
+        start_time = time.time()
+        execution_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        
+        # Create execution log entry (keyed by the URL until a username is extracted)
+        log_entry = ExecutionLog(
+            username=reddit_url,
+            execution_time=execution_time,
+            duration=0,
+            posts_scraped=0,
+            comments_scraped=0,
+            total_content=0,
+            persona_generated=False,
+            model_used=config['model_name']
+        )
+        
+        try:
+            # Extract username
+            username = scraper.extract_username_from_url(reddit_url)
+            log_entry.username = username
+            
+            # Scrape user data, streaming each post to a temp file that only
+            # replaces previously saved data once the scrape succeeds
+            file_path = DirectoryManager.get_scraped_data_path(username)
+            temp_path = f"{file_path}.tmp"
             try:
-                # Scrape user data
-                posts, scraping_stats = scraper.scrape_user_data(username, config['post_limit'])
+                with open(temp_path, 'wb') as scraped_file:
+                    posts, scraping_stats = await scraper.scrape_user_data(
+                        username, config['post_limit'], scraped_file
+                    )
                 
                 if not posts:
                     raise ValueError("No posts found or error occurred during scraping")
                 
-                # Update log entry
-                log_entry.posts_scraped = scraping_stats['posts']
-                log_entry.comments_scraped = scraping_stats['comments']
-                log_entry.total_content = len(posts)
-                
-                # Save scraped data
-                self._save_scraped_data(posts, username)
-                
-                # Generate persona
-                persona = persona_generator.generate_persona(posts, username)
-                
+                os.replace(temp_path, file_path)
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+            
+            # Update log entry
+            log_entry.posts_scraped = scraping_stats['posts']
+            log_entry.comments_scraped = scraping_stats['comments']
+            log_entry.total_content = len(posts)
+            
+            self.logger.info(f"Scraped data saved: {file_path}")
+            print(f"📁 Scraped data saved: {file_path}")
+            
+        except Exception as e:
+            # Log failed execution
+            self._log_failed_execution(log_entry, start_time, e)
+            if len(config['reddit_urls']) == 1:
+                raise
+            return None
+        
+        return {
+            'username': username,
+            'posts': posts,
+            'log_entry': log_entry,
+            'start_time': start_time
+        }
+    
+    def _generate_personas(self, persona_generator: PersonaGenerator, jobs: List[Dict], config: Dict):
+        """Generate, save and log personas for a batch of scraped users"""
+        try:
+            # Generate personas
+            personas = persona_generator.generate_personas_batch(
+                {job['username']: job['posts'] for job in jobs}
+            )
+        except Exception as e:
+            for job in jobs:
+                self._log_failed_execution(job['log_entry'], job['start_time'], e)
+            raise
+        
+        for job in jobs:
+            username = job['username']
+            log_entry = job['log_entry']
+            
+            try:
                 # Save persona
-                self._save_persona(persona, username, execution_time)
-                
-                # Update log entry
-                log_entry.persona_generated = True
-                log_entry.duration = time.time() - start_time
-                
-                # Log successful execution
-                self._log_successful_execution(log_entry, username)
+                self._save_persona(personas[username], username, log_entry.execution_time)
                 
             except Exception as e:
-                # Log failed execution
-                log_entry.duration = time.time() - start_time
-                log_entry.error_message = str(e)
-                self.logger_manager.log_execution(log_entry)
-                raise
+                # Log failed execution, only this user is affected
+                self._log_failed_execution(log_entry, job['start_time'], e)
+                if len(config['reddit_urls']) == 1:
+                    raise
+                continue
             
-            # Log execution
-            self.logger_manager.log_execution(log_entry)
+            # Update log entry
+            log_entry.persona_generated = True
+            log_entry.duration = time.time() - job['start_time']
             
-        except Exception as e:
-            self.logger.error(f"Application error: {e}")
-            print(f"\n❌ Error: {e}")
-            print("\nPlease check:")
-            print("1. Valid Reddit API credentials")
-            print("2. Ollama running with Mistral model installed")
-            print("3. Internet connection")
+            # Log successful execution (written to the execution log exactly once)
+            self._log_successful_execution(log_entry, username)
     
     def _get_user_configuration(self) -> Dict:
         """Get configuration from user input"""
         print("\n📋 Configuration")
         print("-" * 20)
         
-        reddit_url = input("Enter Reddit user profile URL: ").strip()
+        reddit_urls = input("Enter Reddit user profile URL(s), comma-separated: ").strip()
+        reddit_urls = [url.strip() for url in reddit_urls.split(',') if url.strip()]
+        if not reddit_urls:
+            raise ValueError("No Reddit user profile URL provided")
         
         print("\n🔑 Reddit API Configuration:")
         client_id = input("Enter Reddit Client ID: ").strip()
         client_secret = input("Enter Reddit Client Secret: ").strip()
         
         return {
-            'reddit_url': reddit_url,
+            'reddit_urls': reddit_urls,
             'client_id': client_id,
             'client_secret': client_secret,
             'model_name': MISTRAL_MODEL,
             'post_limit': DEFAULT_POST_LIMIT
         }
     
-    def _save_scraped_data(self, posts: List[RedditPost], username: str):
-        """Save scraped data to file"""
-        file_path = DirectoryManager.get_scraped_data_path(username)
-        
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump([asdict(post) for post in posts], f, indent=2, ensure_ascii=False)
-        
-        self.logger.info(f"Scraped data saved: {file_path}")
-        print(f"📁 Scraped data saved: {file_path}")
-    
     def _save_persona(self, persona: UserPersona, username: str, generation_time: str):
         """Save persona to file"""
         file_path = DirectoryManager.get_persona_output_path(username)
@@ -694,6 +1291,12 @@ class PersonaGeneratorApp:
         self.logger.info(f"Persona saved: {file_path}")
         print(f"📄 Persona saved: {file_path}")
     
+    def _log_failed_execution(self, log_entry: ExecutionLog, start_time: float, error: Exception):
+        """Log failed execution details"""
+        log_entry.duration = time.time() - start_time
+        log_entry.error_message = str(error)
+        self.logger_manager.log_execution(log_entry)
+    
     def _log_successful_execution(self, log_entry: ExecutionLog, username: str):
         """Log successful execution details"""
     